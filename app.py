@@ -1,13 +1,37 @@
+import operator
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from urllib.parse import urlparse
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- APP CONFIG ---
 st.set_page_config(page_title="My Cyber Research Bookmarks", layout="wide")
 
+# Bookmarks rendered per page in the research feed
+PAGE_SIZE = 50
+
+# Session state keys of the add-bookmark form inputs
+BOOKMARK_FORM_KEYS = ["new_title", "new_url", "new_cat", "new_tags", "new_notes"]
+
+# Local read-side copy of the sheet, re-synced from Sheets every SYNC_INTERVAL (s)
+LOCAL_CACHE_PATH = "bookmarks_app.parquet"
+SYNC_INTERVAL = 300
+
+# Attempts per background Sheets write while Google rate-limits it (HTTP 429)
+MAX_WRITE_ATTEMPTS = 5
+
 
 # --- DATABASE CONNECTION ---
 @st.cache_resource
@@ -21,36 +45,7 @@ def init_gsheets_connection():
         ]
 
         # Get credentials from Streamlit secrets
-        creds_dict = {
-            "type": st.secrets["connections"]["gsheets"]["service_account"]["type"],
-            "project_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "project_id"
-            ],
-            "private_key_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "private_key_id"
-            ],
-            "private_key": st.secrets["connections"]["gsheets"]["service_account"][
-                "private_key"
-            ],
-            "client_email": st.secrets["connections"]["gsheets"]["service_account"][
-                "client_email"
-            ],
-            "client_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "client_id"
-            ],
-            "auth_uri": st.secrets["connections"]["gsheets"]["service_account"][
-                "auth_uri"
-            ],
-            "token_uri": st.secrets["connections"]["gsheets"]["service_account"][
-                "token_uri"
-            ],
-            "auth_provider_x509_cert_url": st.secrets["connections"]["gsheets"][
-                "service_account"
-            ]["auth_provider_x509_cert_url"],
-            "client_x509_cert_url": st.secrets["connections"]["gsheets"][
-                "service_account"
-            ]["client_x509_cert_url"],
-        }
+        creds_dict = dict(st.secrets["connections"]["gsheets"]["service_account"])
 
         # Create credentials
         credentials = ServiceAccountCredentials.from_json_keyfile_dict(
@@ -60,6 +55,25 @@ def init_gsheets_connection():
         # Authorize and connect
         client = gspread.authorize(credentials)
 
+        # Keep a small pool of persistent HTTPS connections and retry rate
+        # limits / transient server errors with exponential backoff. Mounted
+        # on the client's own authorized session (gspread 6 keeps it on
+        # http_client, gspread 5 on the client itself)
+        http_client = getattr(client, "http_client", client)
+        http_client.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    respect_retry_after_header=True,
+                ),
+            ),
+        )
+
         # Open the spreadsheet
         spreadsheet_id = st.secrets["connections"]["gsheets"]["spreadsheet"]
         sheet = client.open_by_key(spreadsheet_id)
@@ -71,6 +85,88 @@ def init_gsheets_connection():
         return None
 
 
+@st.cache_resource
+def get_worksheet():
+    """Cached handle to the 'main' worksheet"""
+    sheet = init_gsheets_connection()
+    if sheet is None:
+        return None
+    return sheet.worksheet("main")
+
+
+# --- LOCAL CACHE ---
+@st.cache_resource
+def get_sync_state():
+    """Shared state for the local cache and the background Sheets writer"""
+    return {
+        "executor": ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sheets-sync"
+        ),
+        "lock": threading.RLock(),
+        "pending": [],
+        "synced_at": 0.0,
+        "writes": 0,
+        "refreshing": False,
+        "needs_resync": False,
+    }
+
+
+def read_local_bookmarks():
+    """Read bookmarks from the local Parquet cache"""
+    if not os.path.exists(LOCAL_CACHE_PATH):
+        return pd.DataFrame(
+            columns=["date", "title", "url", "category", "tags", "notes"]
+        )
+    return pd.read_parquet(LOCAL_CACHE_PATH)
+
+
+def write_local_bookmarks(df):
+    """Atomically replace the local Parquet cache"""
+    tmp_path = LOCAL_CACHE_PATH + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, LOCAL_CACHE_PATH)
+
+
+def push_to_sheets(func, *args, **kwargs):
+    """Call a gspread write, backing off while Sheets rate-limits it"""
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        try:
+            return func(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code != 429 or attempt == MAX_WRITE_ATTEMPTS - 1:
+                raise
+            # Exponential backoff with jitter
+            time.sleep(0.5 * 2**attempt + random.uniform(0, 0.5))
+
+
+def queue_sheets_write(func, *args, **kwargs):
+    """Run a Sheets write on the background worker"""
+    state = get_sync_state()
+    with state["lock"]:
+        state["writes"] += 1
+        state["pending"].append(
+            state["executor"].submit(push_to_sheets, func, *args, **kwargs)
+        )
+
+
+def collect_failed_writes():
+    """Drop finished background writes and return the errors of failed ones"""
+    state = get_sync_state()
+    errors = []
+    with state["lock"]:
+        for future in [f for f in state["pending"] if f.done()]:
+            state["pending"].remove(future)
+            if future.exception() is not None:
+                errors.append(str(future.exception()))
+        if errors:
+            state["synced_at"] = 0.0
+            state["needs_resync"] = True
+
+    if errors:
+        get_bookmarks.clear()
+    return errors
+
+
 # ==============================================================================
 # LOGO & HEADER
 # ==============================================================================
@@ -81,39 +177,104 @@ except Exception as e:
     st.sidebar.warning(f"Logo not found: {e}")
 
 
-def get_bookmarks():
-    """Read data from Google Sheets"""
-    try:
-        sheet = init_gsheets_connection()
-        if sheet is None:
-            return pd.DataFrame(
-                columns=["date", "title", "url", "category", "tags", "notes"]
-            )
-
-        # Get the 'main' worksheet
-        worksheet = sheet.worksheet("main")
+def fetch_sheet_bookmarks(worksheet):
+    """Read data from the given Google Sheets worksheet"""
+    # Get the raw values, restricted to the bookmark columns
+    rows = worksheet.get("A:F")
 
-        # Get all values
-        data = worksheet.get_all_records()
+    required_columns = ["date", "title", "url", "category", "tags", "notes"]
+    if not rows:
+        return pd.DataFrame(columns=required_columns)
 
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
+    # Build the DataFrame straight from the 2D list; the API trims
+    # trailing empty cells, so pad short rows out to the header width
+    header = rows[0]
+    width = len(header)
+    records = [(row + [""] * width)[:width] for row in rows[1:]]
+    df = pd.DataFrame(records, columns=header)
 
-        # Ensure all required columns exist
-        required_columns = ["date", "title", "url", "category", "tags", "notes"]
+    # Ensure all required columns exist
+    if header != required_columns:
         for col in required_columns:
             if col not in df.columns:
                 df[col] = ""
 
-        return df
+    return df
+
+
+def sync_local_bookmarks(state, worksheet, generation):
+    """Re-sync the local cache, unless writes were queued since `generation`"""
+    try:
+        df = fetch_sheet_bookmarks(worksheet)
+
+        # Writes queued after this re-sync aren't in the sheet yet
+        with state["lock"]:
+            if state["writes"] != generation:
+                return
+            write_local_bookmarks(df)
+            state["synced_at"] = time.time()
+            state["needs_resync"] = False
+    finally:
+        with state["lock"]:
+            state["refreshing"] = False
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_bookmarks():
+    """Read bookmarks from the local cache, re-syncing from Sheets when stale"""
+    state = get_sync_state()
+    blocking_sync = None
+    with state["lock"]:
+        stale = time.time() - state["synced_at"] >= SYNC_INTERVAL
+        if state["needs_resync"] or not os.path.exists(LOCAL_CACHE_PATH):
+            # Nothing to show yet, or a failed write left the local copy out
+            # of step with the sheet: wait for a sync, queued on the worker
+            # behind any pending writes
+            worksheet = get_worksheet()
+            if worksheet is not None:
+                state["refreshing"] = True
+                blocking_sync = state["executor"].submit(
+                    sync_local_bookmarks, state, worksheet, state["writes"]
+                )
+        elif stale and not state["refreshing"]:
+            # Serve the local copy and re-sync on the background worker,
+            # queued behind any pending writes so it sees them applied. It is
+            # kept out of "pending": a failed read isn't a failed write, and
+            # the stale synced_at already makes the next call retry it
+            worksheet = get_worksheet()
+            if worksheet is not None:
+                state["refreshing"] = True
+                state["executor"].submit(
+                    sync_local_bookmarks, state, worksheet, state["writes"]
+                )
+
+    # Wait outside the lock, since the worker needs it to finish the sync
+    if blocking_sync is not None:
+        blocking_sync.result()
+        if state["needs_resync"]:
+            # New writes were queued meanwhile, so the download was discarded;
+            # raise rather than cache the out-of-step copy
+            raise RuntimeError(
+                "Bookmarks changed while re-syncing with Google Sheets, reload to retry"
+            )
+
+    return read_local_bookmarks()
+
+
+def load_bookmarks(context="main"):
+    """Cached bookmarks, rendering connection errors instead of raising them"""
+    try:
+        return get_bookmarks()
 
     except Exception as e:
         error_msg = str(e)
 
         # Only show detailed errors in main area
-        if "sidebar" not in st.session_state.get("current_context", ""):
+        if context != "sidebar":
             with st.expander("🔍 Connection Error Details", expanded=True):
                 st.error(f"**Error**: {error_msg}")
+                if os.path.exists(LOCAL_CACHE_PATH):
+                    st.info("💾 Showing the last local copy until the sync recovers")
 
                 if "permission" in error_msg.lower() or "403" in error_msg:
                     st.warning("🔒 **Permission Issue**")
@@ -143,31 +304,45 @@ def get_bookmarks():
                     """
                     )
 
-        return pd.DataFrame(
-            columns=["date", "title", "url", "category", "tags", "notes"]
-        )
+        # Fall back to the local copy, possibly behind the sheet; deletes are
+        # refused until a re-sync succeeds, so serving it is safe
+        try:
+            return read_local_bookmarks()
+        except Exception:
+            return pd.DataFrame(
+                columns=["date", "title", "url", "category", "tags", "notes"]
+            )
 
 
 def save_bookmark(new_row_data):
     """Save a new bookmark to Google Sheets"""
     try:
-        sheet = init_gsheets_connection()
-        if sheet is None:
+        worksheet = get_worksheet()
+        if worksheet is None:
             return False, "Failed to connect to Google Sheets"
 
-        worksheet = sheet.worksheet("main")
-
-        # Append the new row
-        worksheet.append_row(
-            [
-                new_row_data["date"],
-                new_row_data["title"],
-                new_row_data["url"],
-                new_row_data["category"],
-                new_row_data["tags"],
-                new_row_data["notes"],
-            ]
-        )
+        state = get_sync_state()
+        with state["lock"]:
+            # Write through the local cache so the bookmark shows up immediately
+            df = read_local_bookmarks()
+            df = pd.concat([df, pd.DataFrame([new_row_data])], ignore_index=True)
+            write_local_bookmarks(df)
+
+            # Append the new row in the background
+            queue_sheets_write(
+                worksheet.append_row,
+                [
+                    new_row_data["date"],
+                    new_row_data["title"],
+                    new_row_data["url"],
+                    new_row_data["category"],
+                    new_row_data["tags"],
+                    new_row_data["notes"],
+                ],
+                value_input_option="RAW",
+                insert_data_option="INSERT_ROWS",
+                table_range="A1",
+            )
 
         return True, "Bookmark saved successfully!"
 
@@ -175,8 +350,39 @@ def save_bookmark(new_row_data):
         return False, f"Error saving: {str(e)}"
 
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_search_index(df):
+    """Lowercased searchable text per bookmark, aligned to df's index"""
+    separator = "\x1f"
+    haystack = df["title"].fillna("").astype(str)
+    for col in ["tags", "notes", "category", "url"]:
+        haystack = haystack + separator + df[col].fillna("").astype(str)
+    return haystack.str.lower()
+
+
+def match_bookmarks(df, search_query):
+    """Literal, case-insensitive match of every search term, aligned to df"""
+    haystack = build_search_index(df)
+    terms = search_query.lower().split()
+    if not terms:
+        return pd.Series(True, index=haystack.index)
+    return reduce(
+        operator.and_,
+        (haystack.str.contains(term, regex=False, na=False) for term in terms),
+    )
+
+
+# Plain ASCII host (no IPv6 brackets), ending at a path, query, fragment or the
+# end; anything else goes through urlparse so results match it exactly
+_HTTP_URL_RE = re.compile(r"^https?://[A-Za-z0-9.\-_~%:@]+(?:[/?#]|$)", re.IGNORECASE)
+
+
 def validate_url(url):
     """Basic URL validation"""
+    # Fast path for the common http(s) case; fall back to urlparse otherwise
+    if _HTTP_URL_RE.match(url):
+        return True
+
     try:
         result = urlparse(url)
         return all([result.scheme, result.netloc])
@@ -184,34 +390,110 @@ def validate_url(url):
         return False
 
 
+# --- UI FRAGMENTS ---
+@st.fragment
+def render_stats(df):
+    """Bookmark count shown in the sidebar"""
+    st.metric("Total Bookmarks", len(df))
+
+
+@st.fragment
+def render_feed(df):
+    """Search box and paginated bookmark list, rerun on their own as a fragment"""
+    # Search functionality
+    search_query = st.text_input(
+        "🔍 Search bookmarks...", placeholder="Search by title, tags, or notes..."
+    )
+
+    if not df.empty and len(df) > 0:
+        # Reverse to show newest first
+        display_df = df.iloc[::-1]
+
+        if search_query:
+            # Vectorized, literal AND-matching over the precomputed search index
+            mask = match_bookmarks(df, search_query)
+            display_df = display_df[mask.loc[display_df.index]]
+
+        if len(display_df) == 0:
+            st.info(f"No bookmarks match '{search_query}'")
+        else:
+            # Only render one page of results at a time
+            page_count = max(1, (len(display_df) + PAGE_SIZE - 1) // PAGE_SIZE)
+            page = 1
+            if page_count > 1:
+                page = st.number_input(
+                    "Page", min_value=1, max_value=page_count, value=1
+                )
+            view = display_df.iloc[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+            for row in view.itertuples(index=False):
+                with st.container():
+                    col1, col2 = st.columns([4, 1])
+                    with col1:
+                        st.markdown(f"### [{row.title}]({row.url})")
+                        st.markdown(f"**`{row.category}`** 📅 {row.date}")
+                        if pd.notna(row.tags) and row.tags:
+                            st.caption(f"🏷️ {row.tags}")
+                        if pd.notna(row.notes) and row.notes:
+                            with st.expander("View Notes"):
+                                st.write(row.notes)
+                    st.divider()
+    else:
+        st.info("📝 No bookmarks found. Add one in the sidebar to get started!")
+        st.markdown("---")
+        st.markdown("### Quick Start:")
+        st.markdown("1. Fill out the form in the sidebar")
+        st.markdown("2. Click 'Save Bookmark'")
+        st.markdown("3. Your bookmark will appear here!")
+
+
 # --- UI TITLE ---
 st.title("🔖 Personal Bookmark Manager")
 
+# Surface background Sheets writes that failed since the last rerun
+for error in collect_failed_writes():
+    st.error(f"❌ Sync to Google Sheets failed, reloading from the sheet: {error}")
+
+# Fetch once per rerun and share between the sidebar and the main view
+df = load_bookmarks()
+
 # --- SIDEBAR: ADD NEW BOOKMARK ---
 with st.sidebar:
-    st.session_state["current_context"] = "sidebar"
     st.header("Add New Bookmark")
 
-    new_title = st.text_input("Title", placeholder="e.g., Sliver C2 Documentation")
-    new_url = st.text_input("URL", placeholder="https://...")
-    new_cat = st.selectbox(
-        "Category",
-        [
-            "Offensive Security",
-            "Finance",
-            "Real Estate",
-            "YouTube",
-            "Tools",
-            "Articles",
-            "Documentation",
-        ],
-    )
-    new_tags = st.text_input(
-        "Tags (comma-separated)", placeholder="c2, redteam, golang"
-    )
-    new_notes = st.text_area("Notes (optional)")
+    # Reset the inputs after a successful save; this has to happen before the
+    # widgets are created, so it's flagged and applied on the next rerun
+    if st.session_state.pop("reset_bookmark_form", False):
+        for key in BOOKMARK_FORM_KEYS:
+            st.session_state.pop(key, None)
+
+    # Batch the inputs so typing doesn't rerun the app until Save is clicked.
+    # The form isn't cleared on submit, so a failed validation keeps the input
+    with st.form("add_bookmark"):
+        new_title = st.text_input(
+            "Title", placeholder="e.g., Sliver C2 Documentation", key="new_title"
+        )
+        new_url = st.text_input("URL", placeholder="https://...", key="new_url")
+        new_cat = st.selectbox(
+            "Category",
+            [
+                "Offensive Security",
+                "Finance",
+                "Real Estate",
+                "YouTube",
+                "Tools",
+                "Articles",
+                "Documentation",
+            ],
+            key="new_cat",
+        )
+        new_tags = st.text_input(
+            "Tags (comma-separated)", placeholder="c2, redteam, golang", key="new_tags"
+        )
+        new_notes = st.text_area("Notes (optional)", key="new_notes")
+        submitted = st.form_submit_button("💾 Save Bookmark", type="primary")
 
-    if st.button("💾 Save Bookmark", type="primary"):
+    if submitted:
         if new_url and new_title:
             if not validate_url(new_url):
                 st.error("⚠️ Please enter a valid URL (include http/https)")
@@ -231,8 +513,9 @@ with st.sidebar:
                     if success:
                         st.success("✅ " + message)
                         st.balloons()
-                        # Clear cache and reload
-                        st.cache_resource.clear()
+                        # Clear cached data and the form, then reload
+                        st.session_state["reset_bookmark_form"] = True
+                        get_bookmarks.clear()
                         st.rerun()
                     else:
                         st.error("❌ " + message)
@@ -242,54 +525,9 @@ with st.sidebar:
     st.divider()
 
     # Get stats
-    try:
-        df_stats = get_bookmarks()
-        st.metric("Total Bookmarks", len(df_stats))
-    except:
-        st.metric("Total Bookmarks", "0")
+    render_stats(df)
 
 # --- MAIN VIEW: RESEARCH FEED ---
-st.session_state["current_context"] = "main"
 st.subheader("📚 Your Research Feed")
 
-df = get_bookmarks()
-
-# Search functionality
-search_query = st.text_input(
-    "🔍 Search bookmarks...", placeholder="Search by title, tags, or notes..."
-)
-
-if not df.empty and len(df) > 0:
-    # Reverse to show newest first
-    display_df = df.iloc[::-1].copy()
-
-    if search_query:
-        # Simple string matching across all columns
-        mask = display_df.apply(
-            lambda row: row.astype(str).str.contains(search_query, case=False).any(),
-            axis=1,
-        )
-        display_df = display_df[mask]
-
-    if len(display_df) == 0:
-        st.info(f"No bookmarks match '{search_query}'")
-    else:
-        for index, row in display_df.iterrows():
-            with st.container():
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.markdown(f"### [{row['title']}]({row['url']})")
-                    st.markdown(f"**`{row['category']}`** 📅 {row['date']}")
-                    if pd.notna(row["tags"]) and row["tags"]:
-                        st.caption(f"🏷️ {row['tags']}")
-                    if pd.notna(row["notes"]) and row["notes"]:
-                        with st.expander("View Notes"):
-                            st.write(row["notes"])
-                st.divider()
-else:
-    st.info("📝 No bookmarks found. Add one in the sidebar to get started!")
-    st.markdown("---")
-    st.markdown("### Quick Start:")
-    st.markdown("1. Fill out the form in the sidebar")
-    st.markdown("2. Click 'Save Bookmark'")
-    st.markdown("3. Your bookmark will appear here!")
+render_feed(df)
@@ -1,14 +1,47 @@
+import operator
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from urllib.parse import urlparse
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
 
 # --- APP CONFIG ---
 st.set_page_config(page_title="My Cyber Research Bookmarks", layout="wide")
 
+# Bookmarks rendered per page in the research feed
+PAGE_SIZE = 50
+
+# Session state keys of the add-bookmark form inputs
+BOOKMARK_FORM_KEYS = ["new_title", "new_url", "new_cat", "new_tags", "new_notes"]
+
+# Local read-side copy of the sheet, re-synced from Sheets every SYNC_INTERVAL (s)
+LOCAL_CACHE_PATH = "bookmarks_appv2.parquet"
+SYNC_INTERVAL = 300
+
+# Attempts per background Sheets write while Google rate-limits it (HTTP 429)
+MAX_WRITE_ATTEMPTS = 5
+
+# Optional change-detection cell on the 'main' tab. When it holds
+# =COUNTA(A:F)&"-"&SUMPRODUCT(LEN(A:F)) a re-sync reads just this cell and
+# skips the full download if it hasn't changed; when empty, every re-sync
+# reads the whole sheet. The signature misses edits that keep the cell count
+# and total length (e.g. "Tools" -> "Books"), so the whole sheet is still
+# downloaded at least every FULL_SYNC_INTERVALS re-syncs
+SIGNATURE_CELL = "H1"
+FULL_SYNC_INTERVALS = 6
+
 
 # --- DATABASE CONNECTION ---
 @st.cache_resource
@@ -22,36 +55,7 @@ def init_gsheets_connection():
         ]
 
         # Get credentials from Streamlit secrets
-        creds_dict = {
-            "type": st.secrets["connections"]["gsheets"]["service_account"]["type"],
-            "project_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "project_id"
-            ],
-            "private_key_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "private_key_id"
-            ],
-            "private_key": st.secrets["connections"]["gsheets"]["service_account"][
-                "private_key"
-            ],
-            "client_email": st.secrets["connections"]["gsheets"]["service_account"][
-                "client_email"
-            ],
-            "client_id": st.secrets["connections"]["gsheets"]["service_account"][
-                "client_id"
-            ],
-            "auth_uri": st.secrets["connections"]["gsheets"]["service_account"][
-                "auth_uri"
-            ],
-            "token_uri": st.secrets["connections"]["gsheets"]["service_account"][
-                "token_uri"
-            ],
-            "auth_provider_x509_cert_url": st.secrets["connections"]["gsheets"][
-                "service_account"
-            ]["auth_provider_x509_cert_url"],
-            "client_x509_cert_url": st.secrets["connections"]["gsheets"][
-                "service_account"
-            ]["client_x509_cert_url"],
-        }
+        creds_dict = dict(st.secrets["connections"]["gsheets"]["service_account"])
 
         # Create credentials
         credentials = ServiceAccountCredentials.from_json_keyfile_dict(
@@ -61,6 +65,25 @@ def init_gsheets_connection():
         # Authorize and connect
         client = gspread.authorize(credentials)
 
+        # Keep a small pool of persistent HTTPS connections and retry rate
+        # limits / transient server errors with exponential backoff. Mounted
+        # on the client's own authorized session (gspread 6 keeps it on
+        # http_client, gspread 5 on the client itself)
+        http_client = getattr(client, "http_client", client)
+        http_client.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    respect_retry_after_header=True,
+                ),
+            ),
+        )
+
         # Open the spreadsheet
         spreadsheet_id = st.secrets["connections"]["gsheets"]["spreadsheet"]
         sheet = client.open_by_key(spreadsheet_id)
@@ -72,6 +95,166 @@ def init_gsheets_connection():
         return None
 
 
+@st.cache_resource
+def get_worksheet():
+    """
+    Get the 'main' worksheet, cached alongside the connection
+
+    Returns:
+        gspread.Worksheet: The 'main' worksheet, or None if not connected
+    """
+    sheet = init_gsheets_connection()
+    if sheet is None:
+        return None
+    return sheet.worksheet("main")
+
+
+# --- LOCAL CACHE ---
+@st.cache_resource
+def get_sync_state():
+    """
+    Shared state for the local bookmark cache and its background Sheets writer
+
+    A single worker applies Sheets writes in submission order, so row-based
+    deletes stay aligned with the local copy.
+
+    Returns:
+        dict: executor, lock, pending futures, the last sync timestamp, the
+              sheet signature seen at that sync, the last full download
+              timestamp, the local data fingerprint,
+              a counter of queued writes, whether a re-sync is queued and
+              whether a failed write left the local copy out of step
+    """
+    return {
+        "executor": ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sheets-sync"
+        ),
+        "lock": threading.RLock(),
+        "pending": [],
+        "synced_at": 0.0,
+        "sheet_signature": None,
+        "downloaded_at": 0.0,
+        "fingerprint": None,
+        "writes": 0,
+        "refreshing": False,
+        "needs_resync": False,
+    }
+
+
+def read_local_bookmarks():
+    """
+    Read bookmarks from the local Parquet cache
+
+    Returns:
+        pd.DataFrame: Cached bookmarks, or an empty DataFrame if no cache exists
+    """
+    if not os.path.exists(LOCAL_CACHE_PATH):
+        return pd.DataFrame(
+            columns=["date", "title", "url", "category", "tags", "notes"]
+        )
+    return pd.read_parquet(LOCAL_CACHE_PATH)
+
+
+def write_local_bookmarks(state, df):
+    """
+    Atomically replace the local Parquet cache, skipping unchanged data
+
+    Args:
+        state (dict): Shared sync state from get_sync_state
+        df (pd.DataFrame): Bookmarks to persist
+    """
+    fingerprint = hashlib.blake2b(
+        df.to_csv(index=False).encode(), digest_size=16
+    ).hexdigest()
+
+    with state["lock"]:
+        if fingerprint == state["fingerprint"] and os.path.exists(LOCAL_CACHE_PATH):
+            return
+
+        tmp_path = LOCAL_CACHE_PATH + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, LOCAL_CACHE_PATH)
+        state["fingerprint"] = fingerprint
+
+
+def read_sheet_signature(worksheet):
+    """
+    Read the change-detection cell from the 'main' worksheet
+
+    Args:
+        worksheet (gspread.Worksheet): The 'main' worksheet
+
+    Returns:
+        str: The SIGNATURE_CELL value, or None if it's empty
+    """
+    return worksheet.acell(SIGNATURE_CELL).value or None
+
+
+def push_to_sheets(func, *args, **kwargs):
+    """
+    Call a gspread write, backing off while Sheets rate-limits it
+
+    A 429 means Google rejected the request, so resending it can't apply the
+    write twice; any other error is raised straight away.
+
+    Args:
+        func (callable): gspread method performing the write
+        *args, **kwargs: Arguments forwarded to func
+    """
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        try:
+            return func(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code != 429 or attempt == MAX_WRITE_ATTEMPTS - 1:
+                raise
+            # Exponential backoff with jitter
+            time.sleep(0.5 * 2**attempt + random.uniform(0, 0.5))
+
+
+def queue_sheets_write(func, *args, **kwargs):
+    """
+    Run a Sheets write on the background worker
+
+    Args:
+        func (callable): gspread method performing the write
+        *args, **kwargs: Arguments forwarded to func
+    """
+    state = get_sync_state()
+    with state["lock"]:
+        state["writes"] += 1
+        state["pending"].append(
+            state["executor"].submit(push_to_sheets, func, *args, **kwargs)
+        )
+
+
+def collect_failed_writes():
+    """
+    Drop finished background writes and return the errors of failed ones
+
+    A failed write means the local cache no longer matches the sheet, so the
+    next get_bookmarks call waits for a full re-sync from Google Sheets, and
+    deletes are refused until that re-sync has finished.
+
+    Returns:
+        list: Error messages of background writes that failed
+    """
+    state = get_sync_state()
+    errors = []
+    with state["lock"]:
+        for future in [f for f in state["pending"] if f.done()]:
+            state["pending"].remove(future)
+            if future.exception() is not None:
+                errors.append(str(future.exception()))
+        if errors:
+            state["synced_at"] = 0.0
+            state["needs_resync"] = True
+            state["sheet_signature"] = None
+
+    if errors:
+        get_bookmarks.clear()
+    return errors
+
+
 # ==============================================================================
 # LOGO & HEADER
 # ==============================================================================
@@ -82,45 +265,160 @@ except Exception as e:
     st.sidebar.warning(f"Logo not found: {e}")
 
 
-def get_bookmarks():
+def fetch_sheet_bookmarks(worksheet):
     """
     Read data from Google Sheets
 
+    Args:
+        worksheet (gspread.Worksheet): The 'main' worksheet
+
     Returns:
         pd.DataFrame: DataFrame containing all bookmarks with columns:
                      date, title, url, category, tags, notes
     """
+    # Get the raw values, restricted to the bookmark columns
+    rows = worksheet.get("A:F")
+
+    required_columns = ["date", "title", "url", "category", "tags", "notes"]
+    if not rows:
+        return pd.DataFrame(columns=required_columns)
+
+    # Build the DataFrame straight from the 2D list; the API trims
+    # trailing empty cells, so pad short rows out to the header width
+    header = rows[0]
+    width = len(header)
+    records = [(row + [""] * width)[:width] for row in rows[1:]]
+    df = pd.DataFrame(records, columns=header)
+
+    # Ensure all required columns exist
+    if header != required_columns:
+        for col in required_columns:
+            if col not in df.columns:
+                df[col] = ""
+
+    return df
+
+
+def sync_local_bookmarks(state, worksheet, generation):
+    """
+    Re-sync the local cache from Google Sheets
+
+    Usually runs on the background worker, so it only uses what it's passed.
+    The download is discarded if bookmarks were saved or deleted after it was
+    queued, because the sheet doesn't have those changes yet.
+
+    Args:
+        state (dict): Shared sync state from get_sync_state
+        worksheet (gspread.Worksheet): The 'main' worksheet
+        generation (int): state["writes"] when the re-sync was queued
+    """
     try:
-        sheet = init_gsheets_connection()
-        if sheet is None:
-            return pd.DataFrame(
-                columns=["date", "title", "url", "category", "tags", "notes"]
+        # Single-cell read first; an unchanged signature means the local copy
+        # is probably still current and the full download can be skipped,
+        # unless the last full download is too old to trust the signature
+        signature = read_sheet_signature(worksheet)
+        overdue = (
+            time.time() - state["downloaded_at"]
+            >= FULL_SYNC_INTERVALS * SYNC_INTERVAL
+        )
+        df = None
+        if (
+            signature is None
+            or signature != state["sheet_signature"]
+            or overdue
+            or not os.path.exists(LOCAL_CACHE_PATH)
+        ):
+            df = fetch_sheet_bookmarks(worksheet)
+
+        with state["lock"]:
+            if state["writes"] != generation:
+                return
+            if df is not None:
+                write_local_bookmarks(state, df)
+                state["sheet_signature"] = signature
+                state["downloaded_at"] = time.time()
+            state["synced_at"] = time.time()
+            state["needs_resync"] = False
+    finally:
+        with state["lock"]:
+            state["refreshing"] = False
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_bookmarks():
+    """
+    Read bookmarks from the local cache, re-syncing from Google Sheets when stale
+
+    Only successful reads are cached; errors propagate to load_bookmarks so
+    the next rerun retries instead of replaying a cached failure.
+
+    Returns:
+        pd.DataFrame: DataFrame containing all bookmarks with columns:
+                     date, title, url, category, tags, notes
+    """
+    state = get_sync_state()
+    blocking_sync = None
+    with state["lock"]:
+        stale = time.time() - state["synced_at"] >= SYNC_INTERVAL
+        if state["needs_resync"] or not os.path.exists(LOCAL_CACHE_PATH):
+            # Nothing to show yet, or a failed write left the local copy out
+            # of step with the sheet: wait for a sync, queued on the worker
+            # behind any pending writes
+            worksheet = get_worksheet()
+            if worksheet is not None:
+                state["refreshing"] = True
+                blocking_sync = state["executor"].submit(
+                    sync_local_bookmarks, state, worksheet, state["writes"]
+                )
+        elif stale and not state["refreshing"]:
+            # Serve the local copy and re-sync on the background worker,
+            # queued behind any pending writes so it sees them applied. It is
+            # kept out of "pending": a failed read isn't a failed write, and
+            # the stale synced_at already makes the next call retry it
+            worksheet = get_worksheet()
+            if worksheet is not None:
+                state["refreshing"] = True
+                state["executor"].submit(
+                    sync_local_bookmarks, state, worksheet, state["writes"]
+                )
+
+    # Wait outside the lock, since the worker needs it to finish the sync
+    if blocking_sync is not None:
+        blocking_sync.result()
+        if state["needs_resync"]:
+            # New writes were queued meanwhile, so the download was discarded;
+            # raise rather than cache the out-of-step copy
+            raise RuntimeError(
+                "Bookmarks changed while re-syncing with Google Sheets, reload to retry"
             )
 
-        # Get the 'main' worksheet
-        worksheet = sheet.worksheet("main")
+    return read_local_bookmarks()
 
-        # Get all values
-        data = worksheet.get_all_records()
 
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
+def load_bookmarks(context="main"):
+    """
+    Get the bookmarks, rendering connection errors instead of raising them
 
-        # Ensure all required columns exist
-        required_columns = ["date", "title", "url", "category", "tags", "notes"]
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = ""
+    Args:
+        context (str): Where the caller renders ("main" or "sidebar");
+                       detailed connection errors are only shown in "main"
 
-        return df
+    Returns:
+        pd.DataFrame: DataFrame containing all bookmarks, falling back to
+                      the local copy (or an empty one) if they couldn't be read
+    """
+    try:
+        return get_bookmarks()
 
     except Exception as e:
         error_msg = str(e)
 
         # Only show detailed errors in main area
-        if "sidebar" not in st.session_state.get("current_context", ""):
+        if context != "sidebar":
             with st.expander("🔍 Connection Error Details", expanded=True):
                 st.error(f"**Error**: {error_msg}")
+                if os.path.exists(LOCAL_CACHE_PATH):
+                    st.info("💾 Showing the last local copy until the sync recovers")
 
                 if "permission" in error_msg.lower() or "403" in error_msg:
                     st.warning("🔒 **Permission Issue**")
@@ -150,9 +448,14 @@ def get_bookmarks():
                     """
                     )
 
-        return pd.DataFrame(
-            columns=["date", "title", "url", "category", "tags", "notes"]
-        )
+        # Fall back to the local copy, possibly behind the sheet; deletes are
+        # refused until a re-sync succeeds, so serving it is safe
+        try:
+            return read_local_bookmarks()
+        except Exception:
+            return pd.DataFrame(
+                columns=["date", "title", "url", "category", "tags", "notes"]
+            )
 
 
 def save_bookmark(new_row_data):
@@ -167,23 +470,32 @@ def save_bookmark(new_row_data):
         tuple: (success: bool, message: str)
     """
     try:
-        sheet = init_gsheets_connection()
-        if sheet is None:
+        worksheet = get_worksheet()
+        if worksheet is None:
             return False, "Failed to connect to Google Sheets"
 
-        worksheet = sheet.worksheet("main")
-
-        # Append the new row
-        worksheet.append_row(
-            [
-                new_row_data["date"],
-                new_row_data["title"],
-                new_row_data["url"],
-                new_row_data["category"],
-                new_row_data["tags"],
-                new_row_data["notes"],
-            ]
-        )
+        state = get_sync_state()
+        with state["lock"]:
+            # Write through the local cache so the bookmark shows up immediately
+            df = read_local_bookmarks()
+            df = pd.concat([df, pd.DataFrame([new_row_data])], ignore_index=True)
+            write_local_bookmarks(state, df)
+
+            # Append the new row in the background
+            queue_sheets_write(
+                worksheet.append_row,
+                [
+                    new_row_data["date"],
+                    new_row_data["title"],
+                    new_row_data["url"],
+                    new_row_data["category"],
+                    new_row_data["tags"],
+                    new_row_data["notes"],
+                ],
+                value_input_option="RAW",
+                insert_data_option="INSERT_ROWS",
+                table_range="A1",
+            )
 
         return True, "Bookmark saved successfully!"
 
@@ -191,36 +503,113 @@ def save_bookmark(new_row_data):
         return False, f"Error saving: {str(e)}"
 
 
-def delete_bookmark(row_index):
+def delete_sheet_rows(worksheet, expected, date_col, url_col):
+    """
+    Delete rows from the sheet after checking they still hold the expected bookmarks
+
+    Runs on the background worker. The local copy can be several minutes old,
+    and the sheet may have been edited directly since then, so each target row
+    is re-read first. If any row's date or URL no longer matches, nothing is
+    deleted and the error triggers a re-sync.
+
+    Args:
+        worksheet (gspread.Worksheet): The 'main' worksheet
+        expected (dict): Sheet row number -> (date, url) the user selected
+        date_col (int): 0-based column of `date` in the sheet
+        url_col (int): 0-based column of `url` in the sheet
+    """
+    # Delete bottom-up so earlier deletions don't shift the rows still queued
+    # in the batch
+    sheet_rows = sorted(expected, reverse=True)
+
+    current = worksheet.batch_get([f"A{row}:F{row}" for row in sheet_rows])
+    for row, values in zip(sheet_rows, current):
+        cells = list(values[0]) if values else []
+        cells += [""] * (max(date_col, url_col) + 1 - len(cells))
+        if (cells[date_col], cells[url_col]) != expected[row]:
+            raise RuntimeError(
+                f"Row {row} changed in Google Sheets since the last sync; "
+                "delete cancelled"
+            )
+
+    requests = [
+        {
+            "deleteDimension": {
+                "range": {
+                    "sheetId": worksheet.id,
+                    "dimension": "ROWS",
+                    "startIndex": row - 1,
+                    "endIndex": row,
+                }
+            }
+        }
+        for row in sheet_rows
+    ]
+    worksheet.spreadsheet.batch_update({"requests": requests})
+
+
+def delete_bookmarks(selected):
     """
-    Delete a bookmark from Google Sheets
+    Delete several bookmarks from Google Sheets in a single batch request
 
     Args:
-        row_index (int): The row number to delete (1-indexed, accounting for header)
+        selected (pd.DataFrame): The bookmarks the user picked, indexed by
+                                 their DataFrame row (0-indexed)
 
     Returns:
         tuple: (success: bool, message: str)
     """
     try:
-        sheet = init_gsheets_connection()
-        if sheet is None:
+        worksheet = get_worksheet()
+        if worksheet is None:
             return False, "Failed to connect to Google Sheets"
 
-        worksheet = sheet.worksheet("main")
-
-        # Google Sheets rows are 1-indexed, and we need to account for the header row
-        # row_index from our DataFrame needs +2 (1 for header, 1 for 0-indexed to 1-indexed)
-        sheet_row_number = row_index + 2
+        expected = {}
+        for idx, row in selected.iterrows():
+            # Google Sheets rows are 1-indexed, and we need to account for the
+            # header row (+2 per DataFrame index)
+            expected[int(idx) + 2] = (str(row["date"]), str(row["url"]))
+
+        state = get_sync_state()
+        with state["lock"]:
+            # Row positions can't be trusted until the re-sync after a failed
+            # write has finished
+            if state["needs_resync"]:
+                return False, "Re-syncing with Google Sheets, try again in a moment"
+
+            df = read_local_bookmarks()
+
+            # The page may have been rendered from an older copy than the
+            # local file; only delete if the same bookmarks are still there
+            for sheet_row, key in expected.items():
+                idx = sheet_row - 2
+                if idx not in df.index or (
+                    str(df.at[idx, "date"]),
+                    str(df.at[idx, "url"]),
+                ) != key:
+                    get_bookmarks.clear()
+                    return False, "Bookmarks changed since the page loaded, try again"
+
+            write_local_bookmarks(
+                state,
+                df.drop(index=[row - 2 for row in expected]).reset_index(drop=True),
+            )
 
-        # Delete the row
-        worksheet.delete_rows(sheet_row_number)
+            queue_sheets_write(
+                delete_sheet_rows,
+                worksheet,
+                expected,
+                df.columns.get_loc("date"),
+                df.columns.get_loc("url"),
+            )
 
-        return True, "Bookmark deleted successfully!"
+        return True, f"Deleted {len(expected)} bookmark(s) successfully!"
 
     except Exception as e:
         return False, f"Error deleting: {str(e)}"
 
 
+@st.cache_data(max_entries=4, show_spinner=False)
 def find_duplicates(df):
     """
     Find duplicate bookmarks based on URL
@@ -229,17 +618,64 @@ def find_duplicates(df):
         df (pd.DataFrame): DataFrame containing bookmarks
 
     Returns:
-        pd.DataFrame: DataFrame containing only duplicate entries
+        pd.DataFrame: DataFrame containing only duplicate entries, with the
+                      normalized URL in a `_urlkey` column for grouping
     """
     if df.empty:
         return pd.DataFrame()
 
-    # Find duplicates based on URL (case-insensitive)
-    df["url_lower"] = df["url"].str.lower().str.strip()
-    duplicates = df[df.duplicated(subset=["url_lower"], keep=False)]
-    duplicates = duplicates.drop(columns=["url_lower"])
+    # Find duplicates based on URL (case-insensitive), normalizing only once
+    key = df["url"].str.lower().str.strip()
+    mask = key.duplicated(keep=False)
+
+    return df.assign(_urlkey=key).loc[mask].sort_values("_urlkey")
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_search_index(df):
+    """
+    Build the lowercased text that the search box matches against
+
+    Args:
+        df (pd.DataFrame): DataFrame containing bookmarks
+
+    Returns:
+        pd.Series: One string per bookmark (title, tags, notes, category, url),
+                   aligned to df's index
+    """
+    separator = "\x1f"
+    haystack = df["title"].fillna("").astype(str)
+    for col in ["tags", "notes", "category", "url"]:
+        haystack = haystack + separator + df[col].fillna("").astype(str)
+    return haystack.str.lower()
+
+
+def match_bookmarks(df, search_query):
+    """
+    Match bookmarks containing every whitespace-separated search term
+
+    Terms are matched literally (no regex) and case-insensitively.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing bookmarks
+        search_query (str): Text typed into the search box
+
+    Returns:
+        pd.Series: Boolean mask aligned to df's index
+    """
+    haystack = build_search_index(df)
+    terms = search_query.lower().split()
+    if not terms:
+        return pd.Series(True, index=haystack.index)
+    return reduce(
+        operator.and_,
+        (haystack.str.contains(term, regex=False, na=False) for term in terms),
+    )
+
 
-    return duplicates.sort_values("url")
+# Plain ASCII host (no IPv6 brackets), ending at a path, query, fragment or the
+# end; anything else goes through urlparse so results match it exactly
+_HTTP_URL_RE = re.compile(r"^https?://[A-Za-z0-9.\-_~%:@]+(?:[/?#]|$)", re.IGNORECASE)
 
 
 def validate_url(url):
@@ -252,6 +688,10 @@ def validate_url(url):
     Returns:
         bool: True if valid URL, False otherwise
     """
+    # Fast path for the common http(s) case; fall back to urlparse otherwise
+    if _HTTP_URL_RE.match(url):
+        return True
+
     try:
         result = urlparse(url)
         return all([result.scheme, result.netloc])
@@ -259,34 +699,159 @@ def validate_url(url):
         return False
 
 
+# --- UI FRAGMENTS ---
+@st.fragment
+def render_stats(df, dupe_count):
+    """
+    Render the bookmark and duplicate counts in the sidebar
+
+    Args:
+        df (pd.DataFrame): DataFrame containing all bookmarks
+        dupe_count (int): Number of bookmark entries sharing a URL
+    """
+    try:
+        st.metric("Total Bookmarks", len(df))
+
+        # Show duplicate count
+        if dupe_count:
+            st.metric("🔄 Duplicate URLs", dupe_count)
+    except:
+        st.metric("Total Bookmarks", "0")
+
+
+@st.fragment
+def render_feed(df):
+    """
+    Render the search box and the paginated bookmark list
+
+    Runs as a fragment, so searching and paging only rerun this part of the
+    page instead of the whole app.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing all bookmarks
+    """
+    # Search functionality
+    search_query = st.text_input(
+        "🔍 Search bookmarks...", placeholder="Search by title, tags, or notes..."
+    )
+
+    if not df.empty and len(df) > 0:
+        # Reverse to show newest first
+        display_df = df.iloc[::-1]
+
+        if search_query:
+            # Vectorized, literal AND-matching over the precomputed search index
+            mask = match_bookmarks(df, search_query)
+            display_df = display_df[mask.loc[display_df.index]]
+
+        if len(display_df) == 0:
+            st.info(f"No bookmarks match '{search_query}'")
+        else:
+            # Only render one page of results at a time
+            page_count = max(1, (len(display_df) + PAGE_SIZE - 1) // PAGE_SIZE)
+            page = 1
+            if page_count > 1:
+                page = st.number_input(
+                    "Page", min_value=1, max_value=page_count, value=1
+                )
+            view = display_df.iloc[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+            # One editor widget for the whole page instead of a delete button
+            # per bookmark; rows removed in it are queued for deletion
+            st.caption("Select rows and press Delete to remove bookmarks.")
+
+            # Keyed on the identity of the rows shown (row index, date, url) so
+            # a removal never carries over to a different bookmark, e.g. after
+            # a re-sync replaced rows without changing the count
+            view_signature = hashlib.blake2b(
+                view[["date", "url"]].to_csv().encode(), digest_size=8
+            ).hexdigest()
+
+            columns = ["title", "url", "category", "tags", "notes", "date"]
+            edited = st.data_editor(
+                view[columns],
+                num_rows="dynamic",
+                # Read-only cells; passing the columns rather than True keeps
+                # row selection and deletion enabled
+                disabled=columns,
+                hide_index=True,
+                use_container_width=True,
+                column_config={"url": st.column_config.LinkColumn("url")},
+                key=f"feed_editor_{view_signature}",
+            )
+
+            # The index is the bookmark's DataFrame row, so anything missing
+            # from the edited frame was deleted in the editor
+            removed_rows = view.index.difference(edited.index).tolist()
+            if removed_rows and st.button(
+                f"🗑️ Delete {len(removed_rows)} bookmark(s)", type="primary"
+            ):
+                with st.spinner("Deleting..."):
+                    success, message = delete_bookmarks(view.loc[removed_rows])
+                    if success:
+                        st.success(message)
+                        get_bookmarks.clear()
+                        st.rerun()
+                    else:
+                        st.error(message)
+    else:
+        st.info("📝 No bookmarks found. Add one in the sidebar to get started!")
+        st.markdown("---")
+        st.markdown("### Quick Start:")
+        st.markdown("1. Fill out the form in the sidebar")
+        st.markdown("2. Click 'Save Bookmark'")
+        st.markdown("3. Your bookmark will appear here!")
+
+
 # --- UI TITLE ---
 st.title("🔖 Personal Bookmark Manager")
 
+# Surface background Sheets writes that failed since the last rerun
+for error in collect_failed_writes():
+    st.error(f"❌ Sync to Google Sheets failed, reloading from the sheet: {error}")
+
+# Fetch once per rerun and share between the sidebar and the main view
+df = load_bookmarks()
+duplicates = find_duplicates(df)
+dupe_count = len(duplicates)
+
 # --- SIDEBAR: ADD NEW BOOKMARK ---
 with st.sidebar:
-    st.session_state["current_context"] = "sidebar"
     st.header("Add New Bookmark")
 
-    new_title = st.text_input("Title", placeholder="e.g., Sliver C2 Documentation")
-    new_url = st.text_input("URL", placeholder="https://...")
-    new_cat = st.selectbox(
-        "Category",
-        [
-            "Offensive Security",
-            "Finance",
-            "Real Estate",
-            "YouTube",
-            "Tools",
-            "Articles",
-            "Documentation",
-        ],
-    )
-    new_tags = st.text_input(
-        "Tags (comma-separated)", placeholder="c2, redteam, golang"
-    )
-    new_notes = st.text_area("Notes (optional)")
+    # Reset the inputs after a successful save; this has to happen before the
+    # widgets are created, so it's flagged and applied on the next rerun
+    if st.session_state.pop("reset_bookmark_form", False):
+        for key in BOOKMARK_FORM_KEYS:
+            st.session_state.pop(key, None)
+
+    # Batch the inputs so typing doesn't rerun the app until Save is clicked.
+    # The form isn't cleared on submit, so a failed validation keeps the input
+    with st.form("add_bookmark"):
+        new_title = st.text_input(
+            "Title", placeholder="e.g., Sliver C2 Documentation", key="new_title"
+        )
+        new_url = st.text_input("URL", placeholder="https://...", key="new_url")
+        new_cat = st.selectbox(
+            "Category",
+            [
+                "Offensive Security",
+                "Finance",
+                "Real Estate",
+                "YouTube",
+                "Tools",
+                "Articles",
+                "Documentation",
+            ],
+            key="new_cat",
+        )
+        new_tags = st.text_input(
+            "Tags (comma-separated)", placeholder="c2, redteam, golang", key="new_tags"
+        )
+        new_notes = st.text_area("Notes (optional)", key="new_notes")
+        submitted = st.form_submit_button("💾 Save Bookmark", type="primary")
 
-    if st.button("💾 Save Bookmark", type="primary"):
+    if submitted:
         if new_url and new_title:
             if not validate_url(new_url):
                 st.error("⚠️ Please enter a valid URL (include http/https)")
@@ -305,8 +870,9 @@ with st.sidebar:
 
                     if success:
                         st.success("✅ " + message)
-                        # Clear cache and reload
-                        st.cache_resource.clear()
+                        # Clear cached data and the form, then reload
+                        st.session_state["reset_bookmark_form"] = True
+                        get_bookmarks.clear()
                         st.rerun()
                     else:
                         st.error("❌ " + message)
@@ -316,107 +882,34 @@ with st.sidebar:
     st.divider()
 
     # Get stats
-    try:
-        df_stats = get_bookmarks()
-        st.metric("Total Bookmarks", len(df_stats))
-
-        # Show duplicate count
-        duplicates = find_duplicates(df_stats)
-        if not duplicates.empty:
-            st.metric("🔄 Duplicate URLs", len(duplicates))
-    except:
-        st.metric("Total Bookmarks", "0")
+    render_stats(df, dupe_count)
 
 # --- MAIN VIEW: TABS FOR DIFFERENT VIEWS ---
-st.session_state["current_context"] = "main"
-
 # Create tabs for different views
 tab1, tab2 = st.tabs(["📚 All Bookmarks", "🔄 Manage Duplicates"])
 
-df = get_bookmarks()
-
 # TAB 1: ALL BOOKMARKS
 with tab1:
     st.subheader("📚 Your Research Feed")
 
-    # Search functionality
-    search_query = st.text_input(
-        "🔍 Search bookmarks...", placeholder="Search by title, tags, or notes..."
-    )
-
-    if not df.empty and len(df) > 0:
-        # Reverse to show newest first
-        display_df = df.iloc[::-1].copy()
-        # Add index for deletion tracking
-        display_df["original_index"] = range(len(df) - 1, -1, -1)
-
-        if search_query:
-            # Simple string matching across all columns
-            mask = display_df.apply(
-                lambda row: row.astype(str)
-                .str.contains(search_query, case=False)
-                .any(),
-                axis=1,
-            )
-            display_df = display_df[mask]
-
-        if len(display_df) == 0:
-            st.info(f"No bookmarks match '{search_query}'")
-        else:
-            for index, row in display_df.iterrows():
-                with st.container():
-                    col1, col2 = st.columns([5, 1])
-
-                    with col1:
-                        st.markdown(f"### [{row['title']}]({row['url']})")
-                        st.markdown(f"**`{row['category']}`** 📅 {row['date']}")
-                        if pd.notna(row["tags"]) and row["tags"]:
-                            st.caption(f"🏷️ {row['tags']}")
-                        if pd.notna(row["notes"]) and row["notes"]:
-                            with st.expander("View Notes"):
-                                st.write(row["notes"])
-
-                    with col2:
-                        # Delete button for each bookmark
-                        if st.button("🗑️ Delete", key=f"delete_{row['original_index']}"):
-                            with st.spinner("Deleting..."):
-                                success, message = delete_bookmark(
-                                    row["original_index"]
-                                )
-                                if success:
-                                    st.success(message)
-                                    st.cache_resource.clear()
-                                    st.rerun()
-                                else:
-                                    st.error(message)
-
-                    st.divider()
-    else:
-        st.info("📝 No bookmarks found. Add one in the sidebar to get started!")
-        st.markdown("---")
-        st.markdown("### Quick Start:")
-        st.markdown("1. Fill out the form in the sidebar")
-        st.markdown("2. Click 'Save Bookmark'")
-        st.markdown("3. Your bookmark will appear here!")
+    render_feed(df)
 
 # TAB 2: DUPLICATES MANAGEMENT
 with tab2:
     st.subheader("🔄 Duplicate Bookmarks")
     st.markdown("These bookmarks have the same URL. Keep one and delete the others.")
 
-    duplicates = find_duplicates(df)
-
     if duplicates.empty:
         st.success("✅ No duplicate bookmarks found!")
     else:
-        st.warning(f"Found {len(duplicates)} duplicate bookmark entries")
+        st.warning(f"Found {dupe_count} duplicate bookmark entries")
 
-        # Group by URL to show duplicates together
-        for url in duplicates["url"].unique():
-            url_dupes = df[
-                df["url"].str.lower().str.strip() == url.lower().strip()
-            ].copy()
-            url_dupes["original_index"] = url_dupes.index
+        # Rows ticked for deletion, removed together in one batch request
+        selected_rows = []
+
+        # Group by the normalized URL that find_duplicates already computed
+        for _, url_dupes in duplicates.groupby("_urlkey", sort=False):
+            url = url_dupes["url"].iloc[0]
 
             st.markdown(f"### 🔗 URL: `{url}`")
             st.caption(f"Found {len(url_dupes)} copies of this bookmark")
@@ -435,16 +928,32 @@ with tab2:
                         st.caption(f"Row {idx + 2}")  # +2 for header and 0-index
 
                     with col3:
-                        if st.button("🗑️ Delete", key=f"dup_delete_{idx}"):
-                            with st.spinner("Deleting..."):
-                                success, message = delete_bookmark(idx)
-                                if success:
-                                    st.success(message)
-                                    st.cache_resource.clear()
-                                    st.rerun()
-                                else:
-                                    st.error(message)
+                        # Keyed on the bookmark itself, not just its row, so a
+                        # tick never moves to a row that shifted into this slot
+                        if st.checkbox(
+                            "Delete",
+                            key=f"dup_select_{idx}_{row['date']}_{row['url']}",
+                        ):
+                            selected_rows.append(idx)
 
                 st.markdown("---")
 
             st.divider()
+
+        if st.button(
+            f"🗑️ Delete selected ({len(selected_rows)})",
+            type="primary",
+            disabled=not selected_rows,
+        ):
+            with st.spinner("Deleting..."):
+                success, message = delete_bookmarks(duplicates.loc[selected_rows])
+                if success:
+                    st.success(message)
+                    # Drop the ticks so nothing starts out selected next time
+                    for key in list(st.session_state):
+                        if key.startswith("dup_select_"):
+                            del st.session_state[key]
+                    get_bookmarks.clear()
+                    st.rerun()
+                else:
+                    st.error(message)